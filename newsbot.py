@@ -1,13 +1,23 @@
 import json
 import os
+import hmac
+import functools
 import logging
 import traceback
+import threading
+import multiprocessing
+import requests
 from datetime import datetime, timedelta, timezone
-from concurrent.futures import ThreadPoolExecutor
-from flask import Flask
-from newsbot_logics import unpack_watchlist, filter_reports_date, build_reports_section_html, unpack_last_message, send_news
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from flask import Flask, request, jsonify
+from newsbot_logics import WatchlistIndex, filter_reports_date, build_reports_section_html, unpack_last_message, collect_news, send_news_digest, merge_shard_items
+from newsbot_logics import backfill_reports, split_message, plan_reports_query, estimate_total_page, DART_MAX_RANGE_DAYS, DART_RATE_PER_SEC
+from newsbot_archive import NewsArchive
+from newsbot_records import NewsItem, Report, to_state_map, from_state_map
 from utilitylib.telegram import ChatBot
 from utilitylib.finder import CloudFinder
+from utilitylib.planner import Planner
+from utilitylib.jobs import JobQueue
 
 # Korean timezone (UTC+9)
 KST = timezone(timedelta(hours=9))
@@ -22,6 +32,7 @@ logger = logging.getLogger(__name__)
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 CHAT_ID = os.getenv("CHAT_ID")
 API_KEY = os.getenv("API_KEY")
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
 running_local = os.getenv("RUNNING_LOCAL", "false").lower() == "true"
 
 if BOT_TOKEN is None:
@@ -33,119 +44,434 @@ if CHAT_ID is None:
 if API_KEY is None:
     try: from config import API_KEY
     except ImportError: logger.warning("OS variable not found!")
+if ADMIN_TOKEN is None:
+    try: from config import ADMIN_TOKEN
+    except ImportError: logger.warning("OS variable not found!")
 
 app = Flask(__name__)
 logger.info(f"Initialized with running_local={running_local}")
 logger.info(f"BOT_TOKEN present: {bool(BOT_TOKEN)}")
 logger.info(f"CHAT_ID present: {bool(CHAT_ID)}")
 logger.info(f"API_KEY present: {bool(API_KEY)}")
+logger.info(f"ADMIN_TOKEN present: {bool(ADMIN_TOKEN)}")
+
+def admin_error():
+    # Error response unless the request has an X-Admin-Token header matching ADMIN_TOKEN, None if it does.
+    if not ADMIN_TOKEN: return jsonify({"error": "ADMIN_TOKEN is not configured"}), 503
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN):
+        return jsonify({"error": "Forbidden"}), 403
+    return None
+
+def require_admin(route):
+    # Write and trigger routes need the admin token. Without ADMIN_TOKEN they are closed.
+    @functools.wraps(route)
+    def wrapper(*args, **kwargs):
+        return admin_error() or route(*args, **kwargs)
+    return wrapper
+
+BUCKET_NAME = "run-sources-timefolionotify-asia-northeast3"
+RUN_STATE_BLOB = "run_state.json"
+# Coordinator mode: split news/reports jobs into SHARD_COUNT shards of the watchlist.
+# Shards are POSTed to {SHARD_URL}/shard, or run in local processes if SHARD_URL is empty.
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "1"))
+SHARD_URL = os.getenv("SHARD_URL", "")
+SHARD_TIMEOUT = 280
+# A job running longer than this is failed so the next trigger starts a new one (scheduler interval is 30 minutes).
+JOB_TIMEOUT = 20 * 60
+# ?sync=true waits this long for the queued job, within the 300s Cloud Run request timeout.
+SYNC_TIMEOUT = 290
+
+def reset_last_message(myCloud):
+    reset_data = {"printed_news": {}, "printed_reports": {}}
+    if not myCloud.save(reset_data, "last_message.json", local=running_local):
+        raise Exception("Failed to reset last_message.json")
+    logger.info("last_message.json reset successfully")
+    return "last_message.json reset"
+
+# Watchlist index is rebuilt only when watchlist.json generation changes.
+watchlist_cache = {"index": None}
+watchlist_lock = threading.Lock()
+
+def load_watchlist(myCloud):
+    with watchlist_lock:
+        cached = watchlist_cache["index"]
+        generation = myCloud.generation("watchlist.json", local=running_local)
+        if cached is not None and generation is not None and cached.generation == generation:
+            logger.info(f"Watchlist index reused (generation {generation})")
+            return cached
+
+        watchlist = myCloud.load("watchlist.json", local=running_local)
+        if not watchlist: raise Exception("Failed to load watchlist.json")
+        index = WatchlistIndex(watchlist, generation=generation)
+        watchlist_cache["index"] = index
+        logger.info(f"Watchlist loaded successfully ({len(index)} names, generation {generation})")
+        return index
+
+def update_watchlist(myCloud, change):
+    # Copy-on-write: change(index) edits a copy of the cached index, which replaces the cache once saved.
+    # Running jobs keep reading the index they loaded. Returns (new index or None if the upload fails, changed).
+    # The copy rebuilds the whole index, O(watchlist) per edit instead of the O(1) in-place add/remove;
+    # edits are rare admin calls, while a shared index mutated under a running job is not safe.
+    load_watchlist(myCloud)
+    with watchlist_lock:
+        index = watchlist_cache["index"].copy()
+        if change(index) is False: return index, False
+        if not myCloud.save(index.to_watchlist(), "watchlist.json", local=running_local):
+            watchlist_cache["index"] = None
+            return None, True
+        index.generation = myCloud.generation("watchlist.json", local=running_local)
+        watchlist_cache["index"] = index
+        return index, True
+
+archive_cache = {"archive": None}
+
+def get_archive():
+    # Opened on first use so that requests which only check the schedule never touch the disk.
+    if archive_cache["archive"] is None: archive_cache["archive"] = NewsArchive()
+    return archive_cache["archive"]
+
+def run_shard(payload):
+    # Runs one shard of a job and returns its records as state dicts. Handler of /shard and of the local stand-in.
+    myCloud = CloudFinder(BUCKET_NAME)
+    index = load_watchlist(myCloud).shard(payload["shard"], payload["shards"])
+    logger.info(f"Running {payload['job']} shard {payload['shard']}/{payload['shards']} ({len(index)} names)")
+    if payload["job"] == "news":
+        news_by_corp = collect_news(index, payload["last_hour"], archive=get_archive())
+        return {"shard": payload["shard"], "items": to_state_map(news_by_corp)}
+    reports_by_corp = filter_reports_date(payload["date"], index, dart_api_key=API_KEY,
+                                          strategy=payload.get("strategy"), rate=payload.get("rate", DART_RATE_PER_SEC))
+    return {"shard": payload["shard"], "items": to_state_map(reports_by_corp)}
+
+def post_shard(payload):
+    response = requests.post(SHARD_URL.rstrip("/") + "/shard", json=payload, headers={"X-Admin-Token": ADMIN_TOKEN or ""}, timeout=SHARD_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+def dispatch_shards(payload):
+    # Runs every shard in parallel. If any shard fails the job raises, so that the planner retries it
+    # instead of sending a partial digest and overwriting the failed shard's last_message entries.
+    payloads = [{**payload, "shard": shard, "shards": SHARD_COUNT} for shard in range(SHARD_COUNT)]
+    if SHARD_URL:
+        executor, handler = ThreadPoolExecutor(max_workers=SHARD_COUNT), post_shard
+    else:
+        # Local stand-in for shard instances: one process per shard calling the /shard handler directly.
+        executor, handler = ProcessPoolExecutor(max_workers=SHARD_COUNT, mp_context=multiprocessing.get_context("spawn")), run_shard
+    results, failed = [], []
+    with executor:
+        futures = {executor.submit(handler, shard_payload): shard_payload["shard"] for shard_payload in payloads}
+        for future in as_completed(futures):
+            try: results.append(future.result())
+            except Exception as e:
+                logger.error(f"Shard {futures[future]} failed: {e}")
+                failed.append(futures[future])
+    logger.info(f"{len(results)}/{SHARD_COUNT} shards completed")
+    if failed: raise Exception(f"Shards {sorted(failed)} of {SHARD_COUNT} failed")
+    return results
+
+def news_job(myCloud, last_hour):
+    index = load_watchlist(myCloud)
+    if SHARD_COUNT > 1:
+        results = dispatch_shards({"job": "news", "last_hour": last_hour})
+        news_by_corp = merge_shard_items([from_state_map(result["items"], NewsItem) for result in results], index.names())
+    else:
+        # Same cross-corp url dedup as the sharded path, so the digest does not depend on SHARD_COUNT.
+        news_by_corp = merge_shard_items([collect_news(index, last_hour, archive=get_archive())], index.names())
+    send_news_digest(news_by_corp, BOT_TOKEN, CHAT_ID)
+    return f"News for last {last_hour} hours processed"
+
+def collect_reports(index, date, stats):
+    if SHARD_COUNT <= 1:
+        return filter_reports_date(date, index, dart_api_key=API_KEY, stats=stats)
+    # The plan is made once for the whole watchlist. A sweep already covers every corp, so it runs here
+    # once instead of per shard; otherwise shards split the corp queries and the rate limit between them.
+    strategy, costs = plan_reports_query(len(index.d8_codes), estimate_total_page(date, stats, API_KEY))
+    logger.info(f"DART query plan: {strategy} (costs {costs})")
+    if strategy == "sweep":
+        return filter_reports_date(date, index, dart_api_key=API_KEY, stats=stats, strategy=strategy)
+    results = dispatch_shards({"job": "reports", "date": date, "strategy": strategy, "rate": DART_RATE_PER_SEC / SHARD_COUNT})
+    return merge_shard_items([from_state_map(result["items"], Report) for result in results], index.names())
+
+def record_delivered(run_state, reports_by_corp):
+    # run_state["delivered_reports"] = {rcept_no: filing date} of every report sent in the last DART_MAX_RANGE_DAYS.
+    # Unlike last_message.json (reset nightly) and the archive (per instance), it survives for backfill dedup.
+    # Reports whose filing date did not parse are kept under today's date so they are still recorded.
+    today = get_korean_time()
+    run_state.setdefault("delivered_since", today.strftime("%Y%m%d"))
+    delivered = run_state.setdefault("delivered_reports", {})
+    for items in reports_by_corp.values():
+        for item in items: delivered[item.rcept_no] = item.date or today.strftime("%Y%m%d")
+    cutoff = (today - timedelta(days=DART_MAX_RANGE_DAYS)).strftime("%Y%m%d")
+    run_state["delivered_reports"] = {rcept_no: date for rcept_no, date in delivered.items() if date >= cutoff}
+
+def delivered_coverage(run_state):
+    # Earliest filing date for which delivered_reports is complete.
+    today = get_korean_time()
+    cutoff = (today - timedelta(days=DART_MAX_RANGE_DAYS)).strftime("%Y%m%d")
+    return max(run_state.get("delivered_since") or today.strftime("%Y%m%d"), cutoff)
+
+def reports_job(myCloud, run_state):
+    index = load_watchlist(myCloud)
+    last_message = myCloud.load("last_message.json", local=running_local) or {}
+    logger.info("Last message loaded successfully")
+    _, printed_reports = unpack_last_message(last_message)
+
+    logger.info("Step 5: Fetching reports")
+    today = get_korean_time().strftime("%Y%m%d")
+    logger.info(f"Fetching reports for date: {today}")
+    reports_by_corp = collect_reports(index, today, stats=run_state.setdefault("dart", {}))
+    logger.info(f"Fetched reports for {len(reports_by_corp)} companies")
+    archive = get_archive()
+    archive.add_reports(reports_by_corp, tickers=index.d6_codes)
+    sent_ids = archive.sent_report_ids(item.rcept_no for items in reports_by_corp.values() for item in items)
+    sent_ids.update(run_state.get("delivered_reports", {}))
+
+    logger.info("Step 6: Checking for new reports")
+    has_new = False
+    new_reports_by_corp = {}
+    for corp_name, reports_list in reports_by_corp.items():
+        if not reports_list: continue
+        last_reports = [Report.from_state(item) for item in printed_reports.get(corp_name, [])]
+        last_urls = {item.rcept_no for item in last_reports if item.rcept_no}
+        new_items = [item for item in reports_list if item.rcept_no not in last_urls and item.rcept_no not in sent_ids]
+        if new_items:
+            has_new = True
+            new_reports_by_corp[corp_name] = new_items
+            logger.info(f"New reports found for {corp_name}: {len(new_items)} report(s)")
+
+    if not has_new:
+        logger.info("No new information found. Skipping update.")
+        return "No new information found. Skipping update."
+
+    logger.info("Step 7: Building message and sending")
+    reports_msg, _ = build_reports_section_html(new_reports_by_corp)
+    full_msg = reports_msg
+    logger.info(f"Report message length: {len(full_msg)} characters")
+
+    logger.info("Step 8: Sending Telegram message")
+    bot = ChatBot(BOT_TOKEN)
+    bot.send_message(CHAT_ID, full_msg)
+    logger.info("Telegram message sent successfully")
+    archive.mark_reports_sent([item.rcept_no for items in new_reports_by_corp.values() for item in items])
+    record_delivered(run_state, new_reports_by_corp)   # Saved with run_state by run_newsbot
+
+    logger.info("Step 9: Saving last_message.json")
+    all_companies = index.names()
+    complete_reports = {name: [report.to_state() for report in reports_by_corp.get(name, [])] for name in all_companies}
+    save_result = myCloud.save({"printed_news": {}, "printed_reports": complete_reports}, "last_message.json", local=running_local)
+    if not save_result:
+        logger.error("Failed to save last_message.json")
+    else:
+        logger.info("last_message.json saved successfully")
+    return "Message sent successfully"
 
-def run_newsbot():
+def backfill_job(bgn_de, end_de, progress=None):
+    # Sends filings between bgn_de and end_de that were never delivered, as one digest.
+    # Runs on job_queue like run_newsbot, so its read-modify-write of run_state cannot interleave with it.
+    progress = progress or (lambda stage: None)
+    myCloud = CloudFinder(BUCKET_NAME)
+    index = load_watchlist(myCloud)
+    run_state = load_run_state(myCloud)
+    last_message = myCloud.load("last_message.json", local=running_local) or {}
+    _, printed_reports = unpack_last_message(last_message)
+    seen = {item.get('url') for items in printed_reports.values() for item in items if item.get('url')}
+    seen.update(run_state.get("delivered_reports", {}))
+
+    progress("fetching reports")
+    reports_by_corp = backfill_reports(bgn_de, end_de, index, dart_api_key=API_KEY, seen=seen,
+                                       total_page=run_state.get("dart", {}).get("total_page"))
+    archive = get_archive()
+    archive.add_reports(reports_by_corp, tickers=index.d6_codes)
+    sent_ids = archive.sent_report_ids(item.rcept_no for items in reports_by_corp.values() for item in items)
+    new_reports_by_corp = {}
+    for corp_name, reports_list in reports_by_corp.items():
+        new_items = [item for item in reports_list if item.rcept_no not in sent_ids]
+        if new_items: new_reports_by_corp[corp_name] = new_items
+    if not new_reports_by_corp:
+        logger.info(f"No missed reports between {bgn_de} and {end_de}")
+        return f"No missed reports between {bgn_de} and {end_de}"
+
+    progress("sending digest")
+    message, total = build_reports_section_html(new_reports_by_corp, header=f"{bgn_de}~{end_de} 누락 공시입니다.")
+    bot = ChatBot(BOT_TOKEN)
+    for chunk in split_message(message.strip()): bot.send_message(CHAT_ID, chunk)
+    archive.mark_reports_sent([item.rcept_no for items in new_reports_by_corp.values() for item in items])
+    record_delivered(run_state, new_reports_by_corp)
+    if not myCloud.save(run_state, RUN_STATE_BLOB, local=running_local):
+        logger.error(f"Failed to save {RUN_STATE_BLOB}")
+    logger.info(f"Backfill sent {total} report(s) between {bgn_de} and {end_de}")
+    return f"Backfill sent {total} report(s)"
+
+def build_planner(myCloud, run_state):
+    # Missed runs are caught up on the next trigger, so the trigger interval does not need to match these times.
+    planner = Planner(utc_time=9, state=run_state.get("last_runs", {}))
+    planner.add_job("reset_last_message", hour=0, minute=0, func=reset_last_message, kwargs={"myCloud": myCloud}, max_delay=6 * 60)
+    planner.add_job("morning_news", hour=7, minute=30, func=news_job, kwargs={"myCloud": myCloud, "last_hour": 15}, max_delay=3 * 60)
+    planner.add_job("evening_news", hour=16, minute=30, func=news_job, kwargs={"myCloud": myCloud, "last_hour": 9}, max_delay=3 * 60)
+    planner.add_job("hourly_reports", minute=0, func=reports_job, kwargs={"myCloud": myCloud, "run_state": run_state})
+    return planner
+
+def load_run_state(myCloud):
+    # {} only when run_state.json does not exist yet. A failed read raises so the job is retried,
+    # instead of rerunning jobs from empty last_runs and saving that over the real state.
+    run_state = myCloud.load(RUN_STATE_BLOB, local=running_local)
+    if run_state: return run_state
+    if myCloud.exists(RUN_STATE_BLOB, local=running_local) is False: return {}
+    raise Exception(f"Failed to load {RUN_STATE_BLOB}")
+
+def save_run_state(myCloud, run_state, planner):
+    run_state["last_runs"] = planner.state()
+    if not myCloud.save(run_state, RUN_STATE_BLOB, local=running_local):
+        logger.error(f"Failed to save {RUN_STATE_BLOB}")
+
+def run_newsbot(progress=None):
+    # progress(stage) reports the current stage to the job queue.
+    # Raises if any due job failed, so the job queue marks the run as failed.
+    progress = progress or (lambda stage: None)
     try:
         logger.info("=== Starting newsbot execution ===")
-        
+        progress("loading state")
+
         logger.info("Step 1: Initializing CloudFinder")
-        myCloud = CloudFinder("run-sources-timefolionotify-asia-northeast3")
-        
-        # 00:00 - 00:05 : Reset last_message.json
-        current_time = get_korean_time()
-        if current_time.hour == 0 and current_time.minute <= 5:
-            reset_data = {"printed_news": {}, "printed_reports": {}}
-            myCloud.save(reset_data, "last_message.json", local=running_local)
-            logger.info("last_message.json reset successfully")
-        
-        watchlist = myCloud.load("watchlist.json", local=running_local)
-        if not watchlist: return False
-        logger.info(f"Watchlist loaded successfully")
-        
-        last_message = myCloud.load("last_message.json", local=running_local)
-        logger.info("Last message loaded successfully")
-        
-        # Print news at 07:30-07:35 and 16:30-16:35
-        current_time = get_korean_time()
-        in_window_730 = current_time.hour == 7 and 30 <= current_time.minute <= 35
-        in_window_1630 = current_time.hour == 16 and 30 <= current_time.minute <= 35
-
-        if in_window_730:
-            logger.info(send_news(myCloud, watchlist, BOT_TOKEN, CHAT_ID, last_hour=15))
-        elif in_window_1630:
-            logger.info(send_news(myCloud, watchlist, BOT_TOKEN, CHAT_ID, last_hour=9))
-
-        # Send reports at every hh:00 (not every run)
-        is_hourly = current_time.minute <= 5  # Check within first 5 minutes of each hour
-        
-        if not is_hourly:
-            logger.info("Not at hourly interval. Skipping reports check.")
-            return "Skipped - not at hourly interval"
-
-        _, printed_reports = unpack_last_message(last_message)
-
-        logger.info("Step 4: Unpacking watchlist")
-        d6_codes, d8_codes = unpack_watchlist(watchlist)
-        logger.info(f"Unpacked {len(d6_codes)} stock codes")
-
-        logger.info("Step 5: Fetching reports")
-        today = get_korean_time().strftime("%Y%m%d")
-        logger.info(f"Fetching reports for date: {today}")
-        reports_by_corp_raw = filter_reports_date(today, d8_codes, dart_api_key=API_KEY)
-        reports_by_corp = {name: [report] if report else [] for name, report in reports_by_corp_raw.items()}
-        logger.info(f"Fetched reports for {len([r for r in reports_by_corp.values() if r])} companies")
-
-        logger.info("Step 6: Checking for new reports")
-        has_new = False
-        new_reports_by_corp = {}
-        for corp_name, reports_list in reports_by_corp.items():
-            if not reports_list: continue
-            last_reports = printed_reports.get(corp_name, [])
-            last_urls = {item.get('url') for item in last_reports if item.get('url')}
-            new_items = [item for item in reports_list if item.get('url') and item.get('url') not in last_urls]
-            if new_items:
-                has_new = True
-                new_reports_by_corp[corp_name] = new_items
-                logger.info(f"New reports found for {corp_name}: {len(new_items)} report(s)")
-
-        if has_new:
-            logger.info("Step 7: Building message and sending")
-            reports_msg, _ = build_reports_section_html(new_reports_by_corp)
-            full_msg = reports_msg
-            logger.info(f"Report message length: {len(full_msg)} characters")
-            
-            logger.info("Step 8: Sending Telegram message")
-            bot = ChatBot(BOT_TOKEN)
-            bot.send_message(CHAT_ID, full_msg)
-            logger.info("Telegram message sent successfully")
-            
-            logger.info("Step 9: Saving last_message.json")
-            all_companies = set(d6_codes.keys())
-            complete_reports = {name: reports_by_corp.get(name, []) for name in all_companies}
-            save_result = myCloud.save({"printed_news": {}, "printed_reports": complete_reports}, "last_message.json", local=running_local)
-            if not save_result:
-                logger.error("Failed to save last_message.json")
-            else:
-                logger.info("last_message.json saved successfully")
-            
-            logger.info("=== Newsbot execution completed successfully ===")
-            return "Message sent successfully"
-        else:
-            logger.info("No new information found. Skipping update.")
-            return "No new information found. Skipping update."     
+        myCloud = CloudFinder(BUCKET_NAME)
+        run_state = load_run_state(myCloud)
+
+        logger.info("Step 2: Checking schedule")
+        progress("checking schedule")
+        planner = build_planner(myCloud, run_state)
+        results = planner.run_pending(on_job=lambda name: progress(f"running {name}"))
+        if not results:
+            next_time = planner.next_due()
+            logger.info(f"Nothing due until {next_time.strftime('%H:%M')}")
+            return f"Nothing due until {next_time.strftime('%H:%M')}"
+
+        progress("saving state")
+        save_run_state(myCloud, run_state, planner)
+        summary = "\n".join(f"{name}: {result}" for name, result in results.items())
+        logger.info(summary)
+        failed = [name for name, result in results.items() if isinstance(result, Exception)]
+        if failed: raise Exception(f"Jobs failed: {', '.join(failed)}\n{summary}")
+        logger.info("=== Newsbot execution completed ===")
+        return summary
     except Exception as e:
         error_msg = f"Error in run_newsbot: {str(e)}\n{traceback.format_exc()}"
         logger.error(error_msg)
-        return f"Error: {str(e)}"
-    
+        raise
+
+
+# Runs run_newsbot on a background thread; overlapping triggers join the queued or running job.
+job_queue = JobQueue(timeout=JOB_TIMEOUT)
+
+def sync_requested():
+    return request.args.get("sync", "false").lower() == "true"
+
+def job_response(job, created):
+    # ?sync=true waits for the job so it still goes through single-flight; otherwise returns 202 right away.
+    # Waiting holds the only gunicorn thread, so callers must check the admin token first.
+    if not sync_requested():
+        return jsonify({**job, "coalesced": not created}), 202
+    job = job_queue.wait(job["id"], timeout=SYNC_TIMEOUT)
+    if job["status"] == "done": return str(job["result"])
+    if job["status"] == "failed": return f"Error: {job['result']}", 500
+    return jsonify({**job, "coalesced": not created}), 202
 
 @app.route("/", methods=["GET", "POST"])
 def main():
     try:
         logger.info("=== Received request at / endpoint ===")
-        result = run_newsbot()
-        logger.info(f"Request completed with result: {result[:100]}...")
-        return result
+        # Scheduler triggers stay open; a blocking sync request needs the admin token.
+        if sync_requested() and (error := admin_error()): return error
+        job, created = job_queue.submit("run_newsbot", run_newsbot)
+        logger.info(f"Job {job['id']} {'queued' if created else 'already in progress'}")
+        return job_response(job, created)
     except Exception as e:
         error_msg = f"Error in main route: {str(e)}\n{traceback.format_exc()}"
         logger.error(error_msg)
         return f"Error: {str(e)}", 500
 
+@app.route("/backfill", methods=["GET", "POST"])
+@require_admin
+def backfill():
+    # e.g. /backfill?from=20261013&to=20261019 (to defaults to today). Admin only: it sends to the chat.
+    bgn_de = request.args.get("from", "")
+    end_de = request.args.get("to", get_korean_time().strftime("%Y%m%d"))
+    try:
+        days = (datetime.strptime(end_de, "%Y%m%d") - datetime.strptime(bgn_de, "%Y%m%d")).days
+    except ValueError:
+        return jsonify({"error": "from and to must be YYYYMMDD"}), 400
+    if not 0 <= days < DART_MAX_RANGE_DAYS: return jsonify({"error": f"Range must be 1-{DART_MAX_RANGE_DAYS} days"}), 400
+    # Before the coverage date delivered reports are not tracked, so the digest could repeat old filings.
+    try: coverage = delivered_coverage(load_run_state(CloudFinder(BUCKET_NAME)))
+    except Exception as e: return jsonify({"error": str(e)}), 503
+    if bgn_de < coverage and request.args.get("force", "false").lower() != "true":
+        return jsonify({"error": f"Delivered reports are only tracked from {coverage}; add force=true to resend older filings"}), 400
+
+    job, created = job_queue.submit(f"backfill:{bgn_de}:{end_de}", backfill_job, kwargs={"bgn_de": bgn_de, "end_de": end_de})
+    logger.info(f"Backfill job {job['id']} {'queued' if created else 'already in progress'}")
+    return job_response(job, created)
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None: return jsonify({"error": f"Unknown job {job_id}"}), 404
+    return jsonify(job)
+
+@app.route("/shard", methods=["POST"])
+@require_admin
+def shard():
+    # Body: {"job": "news" | "reports", "shard": i, "shards": n, "last_hour": h} or {..., "date": "YYYYMMDD", "strategy": "corp", "rate": r}
+    # Called by the coordinator with its ADMIN_TOKEN (see post_shard); the service itself is public.
+    payload = request.get_json(silent=True) or {}
+    if payload.get("job") not in ("news", "reports"): return jsonify({"error": "job must be news or reports"}), 400
+    try:
+        return jsonify(run_shard(payload))
+    except Exception as e:
+        logger.error(f"Error in shard route: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/archive/<ticker>", methods=["GET"])
+def query_archive(ticker):
+    # e.g. /archive/060720?days=30&kind=reports
+    days = request.args.get("days", 30, type=int)
+    kind = request.args.get("kind", "reports")
+    limit = request.args.get("limit", 500, type=int)
+    if kind not in ("reports", "news"): return jsonify({"error": "kind must be reports or news"}), 400
+    # The archive is per instance and pruned, so an empty result only means "none" from coverage_since onwards.
+    archive = get_archive()
+    return jsonify({"items": archive.query(ticker, days=days, kind=kind, limit=limit),
+                    "coverage_since": archive.coverage(kind), "retention_days": archive.retention_days})
+
+@app.route("/watchlist", methods=["GET"])
+def get_watchlist():
+    index = load_watchlist(CloudFinder(BUCKET_NAME))
+    return jsonify(index.to_watchlist())
+
+@app.route("/watchlist", methods=["POST"])
+@require_admin
+def add_watchlist():
+    # Body: {"name": ..., "stock_code": "060720", "corp_code": "00378628"}
+    data = request.get_json(silent=True) or {}
+    name = data.get("name")
+    if not name: return jsonify({"error": "name is required"}), 400
+    index, _ = update_watchlist(CloudFinder(BUCKET_NAME), lambda index: index.add(name, data.get("stock_code", ""), data.get("corp_code", "")))
+    if index is None: return jsonify({"error": "Failed to save watchlist.json"}), 500
+    logger.info(f"Added {name} to watchlist")
+    return jsonify({"name": name, "size": len(index)})
+
+@app.route("/watchlist/<name>", methods=["DELETE"])
+@require_admin
+def remove_watchlist(name):
+    index, changed = update_watchlist(CloudFinder(BUCKET_NAME), lambda index: index.remove(name))
+    if not changed: return jsonify({"error": f"{name} is not in watchlist"}), 404
+    if index is None: return jsonify({"error": "Failed to save watchlist.json"}), 500
+    logger.info(f"Removed {name} from watchlist")
+    return jsonify({"name": name, "size": len(index)})
+
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 8080)))
+    if os.getenv("RUN_LOOP", "false").lower() == "true":
+        # Long-running mode: sleep until the next job instead of waiting for an external trigger.
+        myCloud = CloudFinder(BUCKET_NAME)
+        run_state = load_run_state(myCloud)
+        planner = build_planner(myCloud, run_state)
+        planner.run_forever(on_run=lambda results, state: save_run_state(myCloud, run_state, planner))
+    else:
+        app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 8080)))
@@ -0,0 +1,119 @@
+import os
+import time
+import sqlite3
+import threading
+
+ARCHIVE_PATH = os.getenv("ARCHIVE_PATH", "newsbot_archive.db")
+# Rows fetched longer ago than this are deleted; the container filesystem counts against instance memory.
+ARCHIVE_RETENTION_DAYS = int(os.getenv("ARCHIVE_RETENTION_DAYS", "30"))
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS news (
+    url TEXT PRIMARY KEY,
+    ticker TEXT NOT NULL,
+    corp_name TEXT,
+    title TEXT,
+    published_at INTEGER,
+    fetched_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_news_ticker_time ON news (ticker, published_at);
+CREATE INDEX IF NOT EXISTS idx_news_time ON news (published_at);
+CREATE INDEX IF NOT EXISTS idx_news_fetched ON news (fetched_at);
+
+CREATE TABLE IF NOT EXISTS reports (
+    rcept_no TEXT PRIMARY KEY,
+    corp_code TEXT NOT NULL,
+    ticker TEXT,
+    corp_name TEXT,
+    title TEXT,
+    filed_at INTEGER,
+    fetched_at INTEGER NOT NULL,
+    sent_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_reports_ticker_time ON reports (ticker, filed_at);
+CREATE INDEX IF NOT EXISTS idx_reports_corp_time ON reports (corp_code, filed_at);
+CREATE INDEX IF NOT EXISTS idx_reports_time ON reports (filed_at);
+CREATE INDEX IF NOT EXISTS idx_reports_fetched ON reports (fetched_at);
+'''
+
+
+class NewsArchive:
+    '''
+    SQLite archive of every fetched news item and DART disclosure.
+    Inserts are batched per run; rows are keyed by url (news) and rcept_no (reports).
+    The file is local to one instance, so it is a cache of what this instance fetched, not durable state.
+    Rows older than retention_days are pruned on each batch; coverage() tells callers how far back it goes.
+    '''
+    def __init__(self, path: str = ARCHIVE_PATH, retention_days: int = ARCHIVE_RETENTION_DAYS):
+        self.path = path
+        self.retention_days = retention_days
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def add_news(self, news_by_ticker: dict, names: dict = None):
+        # news_by_ticker: {stock code: [NewsItem]} as returned by get_news, names: {stock code: corp_name}.
+        now = int(time.time())
+        names = names or {}
+        rows = [(news.url, ticker, names.get(ticker), news.title, news.ts, now)
+                for ticker, news_list in news_by_ticker.items() for news in news_list if news.url]
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO news VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._prune("news", now)
+        return len(rows)
+
+    def add_reports(self, reports_by_corp: dict, tickers: dict = None):
+        # reports_by_corp: {corp_name: [Report]}, tickers: {corp_name: stock code}.
+        now = int(time.time())
+        tickers = tickers or {}
+        rows = [(report.rcept_no, report.corp_code, report.ticker or tickers.get(corp_name), corp_name,
+                 report.title, report.ts, now)
+                for corp_name, reports in reports_by_corp.items() for report in reports]
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO reports (rcept_no, corp_code, ticker, corp_name, title, filed_at, fetched_at) "
+                                  "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._prune("reports", now)
+        return len(rows)
+
+    def _prune(self, table: str, now: int):
+        # Called inside the insert transaction.
+        self.conn.execute(f"DELETE FROM {table} WHERE fetched_at < ?", (now - self.retention_days * 86400,))
+
+    def coverage(self, kind: str = "reports"):
+        # Epoch seconds of the oldest row still held for kind, None if it has none.
+        # Queries reaching further back than this (e.g. after an instance restart) are incomplete.
+        table = "news" if kind == "news" else "reports"
+        with self.lock:
+            return self.conn.execute(f"SELECT MIN(fetched_at) FROM {table}").fetchone()[0]
+
+    def sent_report_ids(self, rcept_nos: list):
+        # Subset of rcept_nos already delivered to Telegram.
+        rcept_nos = list(rcept_nos)
+        if not rcept_nos: return set()
+        sent = set()
+        with self.lock:
+            for i in range(0, len(rcept_nos), 500):
+                chunk = rcept_nos[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = self.conn.execute(f"SELECT rcept_no FROM reports WHERE sent_at IS NOT NULL AND rcept_no IN ({placeholders})", chunk)
+                sent.update(row[0] for row in cursor)
+        return sent
+
+    def mark_reports_sent(self, rcept_nos: list):
+        now = int(time.time())
+        with self.lock, self.conn:
+            self.conn.executemany("UPDATE reports SET sent_at = ? WHERE rcept_no = ?", [(now, rcept_no) for rcept_no in rcept_nos])
+
+    def query(self, ticker: str, days: int = 30, kind: str = "reports", limit: int = 500):
+        # Items of ticker within the last days, newest first. kind is "reports" or "news".
+        since = int(time.time()) - days * 86400
+        if kind == "news":
+            sql = ("SELECT ticker, corp_name, title, url, published_at FROM news "
+                   "WHERE ticker = ? AND published_at >= ? ORDER BY published_at DESC LIMIT ?")
+        else:
+            sql = ("SELECT ticker, corp_name, title, rcept_no, filed_at, sent_at FROM reports "
+                   "WHERE ticker = ? AND filed_at >= ? ORDER BY filed_at DESC LIMIT ?")
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(sql, (ticker, since, limit))]
@@ -1,11 +1,22 @@
 import re
 import os
+import zlib
+import time
+import html
+import queue
+import logging
+import threading
+import multiprocessing
 import requests
 from datetime import datetime, timedelta, timezone
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, as_completed, FIRST_COMPLETED
 from bs4 import BeautifulSoup
+from charset_normalizer import detect
 from utilitylib.telegram import ChatBot
 from utilitylib.planner import Planner
+from newsbot_records import NewsItem, Report
+
+logger = logging.getLogger(__name__)
 
 # Korean timezone (UTC+9)
 KST = timezone(timedelta(hours=9))
@@ -13,7 +24,76 @@ def get_korean_time():
     return datetime.now(KST)
 
 '''
-뉴스 제목 중복 방지, 뉴스 시간 필터링
+관심종목 인덱스
+'''
+class WatchlistIndex:
+    '''
+    Forward and reverse maps of watchlist.json ({name: [stock_code, corp_code]}).
+    generation is the version of the blob the index was built from.
+    A shared index is never modified in place; change a copy() and swap it in.
+    '''
+    def __init__(self, watchlist: dict = None, generation=None):
+        self.generation = generation
+        self.entries = {}       # name -> [6-digit stock code, 8-digit DART corp code]
+        self.d6_codes = {}      # name -> stock code
+        self.d8_codes = {}      # name -> corp code
+        self.d6_to_name = {}
+        self.d8_to_name = {}
+        for name, code_list in (watchlist or {}).items(): self.add(name, code_list[0], code_list[1])
+
+    def __len__(self): return len(self.entries)
+    def __contains__(self, name): return name in self.entries
+
+    def add(self, name: str, d6_code: str = "", d8_code: str = ""):
+        self.remove(name)
+        self.entries[name] = [d6_code, d8_code]
+        if d6_code:
+            self.d6_codes[name] = d6_code
+            self.d6_to_name[d6_code] = name
+        if d8_code:
+            self.d8_codes[name] = d8_code
+            self.d8_to_name[d8_code] = name
+
+    def remove(self, name: str):
+        if name not in self.entries: return False
+        d6_code, d8_code = self.entries.pop(name)
+        if self.d6_codes.pop(name, None) and self.d6_to_name.get(d6_code) == name: del self.d6_to_name[d6_code]
+        if self.d8_codes.pop(name, None) and self.d8_to_name.get(d8_code) == name: del self.d8_to_name[d8_code]
+        return True
+
+    def names(self): return list(self.entries)
+
+    def to_watchlist(self): return {name: list(code_list) for name, code_list in self.entries.items()}
+
+    def copy(self): return WatchlistIndex(self.to_watchlist(), generation=self.generation)
+
+    def shard(self, shard: int, shards: int):
+        # Sub-index of the names assigned to shard by shard_of().
+        return WatchlistIndex({name: code_list for name, code_list in self.entries.items() if shard_of(name, shards) == shard},
+                              generation=self.generation)
+
+
+def shard_of(key: str, shards: int):
+    # Stable across processes and restarts, unlike hash().
+    return zlib.crc32(key.encode("utf-8")) % shards
+
+def merge_shard_items(results: list, order: list):
+    # Merges [{corp_name: [record]}] from shards into one dict in order (watchlist names),
+    # dropping records whose url_hash was already seen in an earlier corp. Unsharded runs pass a single result.
+    merged = {}
+    for result in results:
+        for corp_name, items in result.items(): merged.setdefault(corp_name, []).extend(items)
+    seen = set()
+    digest = {}
+    for corp_name in order:
+        items = [item for item in merged.get(corp_name, []) if item.url_hash not in seen]
+        seen.update(item.url_hash for item in items)
+        if items: digest[corp_name] = items
+    return digest
+
+
+'''
+뉴스 제목 중복 방지
 '''
 def get_duplicated_topic_score_list(curr_topic: str, prev_topics: list[str]):
     # Check if the current topic is duplicated with the previous topics.
@@ -34,30 +114,19 @@ def get_duplicated_topic_score(curr_topic: str, prev_topics: list[str]):
     return max(duplicates) / total_keywords, total_keywords
 
 
-def filter_news_by_time(news_list: list, days: int = 0, hours: int = 0, minutes: int = 0):
-    # Get Korean time and convert to naive for comparison (scraped dates are already in Korean time)
-    threshold = get_korean_time().replace(tzinfo=None) - timedelta(days=days, hours=hours, minutes=minutes)
-    filtered = []
-    for news in news_list:
-        try:
-            news_date = datetime.strptime(news['date'], "%Y.%m.%d %H:%M")
-            if news_date >= threshold: filtered.append(news)
-        except: pass
-    return filtered
-
 '''
 데이터 -> 텔레그램 텍스트 변환
 '''
-def build_reports_section_html(reports_today_by_corp: dict):
-    message = f"<b>오늘의 신규 공시입니다.</b>\n"
+def build_reports_section_html(reports_today_by_corp: dict, header: str = "오늘의 신규 공시입니다."):
+    message = f"<b>{header}</b>\n"
     total_reports = sum((len(v) for v in reports_today_by_corp.values()), 0)
     if total_reports > 0:
         for corp_name, results in reports_today_by_corp.items():
             if not results: continue
             message += f"[{corp_name}]\n"
             for result in results:
-                title = result['title'].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
-                url_href = result['url'].replace('&', '&amp;').replace('"', '&quot;')
+                title = result.title.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+                url_href = result.rcept_no.replace('&', '&amp;').replace('"', '&quot;')
                 title = title.rstrip()
                 url_href = "https://dart.fss.or.kr/dsaf001/main.do?rcpNo=" + url_href
                 message += f"- <a href=\"{url_href}\">{title}</a>\n"
@@ -76,8 +145,8 @@ def build_news_section_html(news_today_by_corp: dict):
                 continue
             message += f"[{corp_name}]\n"
             for result in results:
-                title = result['title'].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
-                url_href = (result.get('url') or '').replace('&', '&amp;').replace('"', '&quot;')
+                title = result.title.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+                url_href = (result.url or '').replace('&', '&amp;').replace('"', '&quot;')
                 if url_href:
                     message += f"- <a href=\"{url_href}\">{title}</a>\n"
                 else:
@@ -90,49 +159,196 @@ def build_news_section_html(news_today_by_corp: dict):
 '''
 공시 데이터 가져오기
 '''
-def get_reports_date(date, dart_api_key):
-    base_url = f"https://opendart.fss.or.kr/api/list.json?crtfc_key={dart_api_key}&bgn_de={date}&end_de={date}&page_count=100"
-    
+DART_LIST_URL = "https://opendart.fss.or.kr/api/list.json"
+DART_PAGE_COUNT = 100
+DART_MAX_WORKERS = 8
+# Cost of one sweep page (100 filings) relative to one per-corp request (usually 0-2 filings).
+# This is a rough weight by work per request, not a request count: a sweep page is a 100-row response that
+# is downloaded, decoded and turned into Reports, while most per-corp requests return status 013 with no rows.
+# Corp mode may therefore send more requests than a sweep; at DART_RATE_PER_SEC both stay far below
+# the daily list.json quota of a key, so the weight only needs to favor the smaller total transfer.
+DART_SWEEP_PAGE_COST = 6
+# Assumed full-day page count when no estimate is recorded.
+DART_DEFAULT_TOTAL_PAGE = 30
+# Request budget (requests per second) shared by all list.json calls of one run.
+DART_RATE_PER_SEC = 10
+# list.json status for "no filings"; any other non-000 status (e.g. 020 rate limit) is an error.
+DART_STATUS_NO_DATA = "013"
+# Seconds to wait for one list.json response; a timeout fails the job so it is retried.
+DART_TIMEOUT = 20
+# list.json rejects date ranges longer than 3 months.
+DART_MAX_RANGE_DAYS = 92
+TELEGRAM_MAX_LENGTH = 4096
+
+class RateLimiter:
+    '''
+    Spaces calls to wait() at least 1 / rate seconds apart across threads.
+    '''
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        self.next_time = 0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if delay > 0: time.sleep(delay)
+
+def get_dart_page(params: dict, page_no: int, dart_api_key, limiter: RateLimiter = None):
+    # One list.json page. Returns (reports, total_page).
+    query = {"crtfc_key": dart_api_key, "page_count": DART_PAGE_COUNT, "page_no": page_no, **params}
+    if limiter: limiter.wait()
+    try: response = requests.get(DART_LIST_URL, params=query, timeout=DART_TIMEOUT).json()
+    except (requests.RequestException, ValueError) as e: raise Exception(f"DART list.json request failed: {e}")
+    if response["status"] == DART_STATUS_NO_DATA: return [], 0
+    if response["status"] != "000": raise Exception(f"DART list.json error {response['status']}: {response.get('message', '')}")
+    reports = [Report.from_dart(report) for report in response["list"]]
+    return reports, response["total_page"]
+
+def get_dart_list(params: dict, dart_api_key, limiter: RateLimiter = None):
+    # Pages through list.json. Pages after the first are fetched concurrently.
+    # Returns (reports, total_page).
+    def fetch_page(page_no): return get_dart_page(params, page_no, dart_api_key, limiter=limiter)
+
+    results, total_page = fetch_page(1)
+    if total_page > 1:
+        with ThreadPoolExecutor(max_workers=DART_MAX_WORKERS) as executor:
+            for reports, _ in executor.map(fetch_page, range(2, total_page + 1)): results.extend(reports)
+    return results, total_page
+
+def get_reports_date(date, dart_api_key, limiter: RateLimiter = None):
+    # Full-day sweep of every filing in the market. Returns (reports, total_page).
+    return get_dart_list({"bgn_de": date, "end_de": date}, dart_api_key, limiter=limiter)
+
+def get_reports_corp(date, corp_codes: list, dart_api_key, end_de=None, limiter: RateLimiter = None):
+    # One list.json query per corp_code for date (through end_de if given), run concurrently.
+    def fetch_corp(corp_code):
+        reports, _ = get_dart_list({"corp_code": corp_code, "bgn_de": date, "end_de": end_de or date}, dart_api_key, limiter=limiter)
+        return reports
     results = []
-    page_no = 1
-    while True:
-        requesting_url = base_url + f"&page_no={page_no}"
-        response = requests.get(requesting_url)
-        response = response.json()
-        if response["status"] != "000": return []
-
-        for report in response["list"]:
-            results.append({
-                "d8_code": report["corp_code"],
-                "title": report["report_nm"],
-                "url": report["rcept_no"]
-            })
-        if page_no == response["total_page"]: break
-        else: page_no += 1
+    with ThreadPoolExecutor(max_workers=DART_MAX_WORKERS) as executor:
+        for reports in executor.map(fetch_corp, corp_codes): results.extend(reports)
     return results
 
-def filter_reports_date(date, watchlist, dart_api_key):
-    full_reports = get_reports_date(date, dart_api_key=dart_api_key)
+def plan_reports_query(corp_count: int, total_page: int = None):
+    # Estimate request cost of per-corp queries vs a full-day sweep and pick the cheaper one.
+    # Returns ("corp" | "sweep", {"corp": cost, "sweep": cost}).
+    costs = {
+        "corp": corp_count,
+        "sweep": (DART_DEFAULT_TOTAL_PAGE if total_page is None else total_page) * DART_SWEEP_PAGE_COST,
+    }
+    return ("corp" if costs["corp"] < costs["sweep"] else "sweep"), costs
+
+def estimate_total_page(date, stats: dict, dart_api_key, limiter: RateLimiter = None):
+    # Full-day page count of date for plan_reports_query. Corp mode never sees total_page, so the estimate
+    # is refreshed by a single page-1 sweep request the first time each date is planned; sweeps keep it current.
+    if stats.get("total_page_date") != date:
+        _, total_page = get_dart_page({"bgn_de": date, "end_de": date}, 1, dart_api_key, limiter=limiter)
+        stats["total_page"], stats["total_page_date"] = total_page, date
+    return stats["total_page"]
+
+def date_range(bgn_de, end_de):
+    # ["YYYYMMDD", ...] from bgn_de through end_de.
+    bgn = datetime.strptime(bgn_de, "%Y%m%d")
+    end = datetime.strptime(end_de, "%Y%m%d")
+    return [(bgn + timedelta(days=i)).strftime("%Y%m%d") for i in range((end - bgn).days + 1)]
+
+def backfill_reports(bgn_de, end_de, index: WatchlistIndex, dart_api_key, seen: set = None, rate: float = DART_RATE_PER_SEC, total_page: int = None):
+    # Filings of watchlist corps between bgn_de and end_de, skipping rcept_no in seen.
+    # Days (or corp_codes) are fetched concurrently within rate requests per second.
+    # Returns {corp_name: [Report]} in watchlist order, oldest filing first.
+    days = date_range(bgn_de, end_de)
+    seen = seen or set()
+    limiter = RateLimiter(rate)
+    corp_codes = list(index.d8_codes.values())
+    # A corp_code query covers the whole range in one request; a sweep costs total_page per day.
+    strategy, costs = plan_reports_query(len(corp_codes), (total_page or DART_DEFAULT_TOTAL_PAGE) * len(days))
+    logger.info(f"DART backfill {bgn_de}-{end_de} plan: {strategy} (costs {costs})")
+
+    results = {}
+    def collect(reports):
+        for report in reports:
+            corp_name = index.d8_to_name.get(report.corp_code)
+            if corp_name and report.rcept_no not in seen:
+                seen.add(report.rcept_no)
+                results.setdefault(corp_name, []).append(report)
+
+    if strategy == "corp":
+        collect(get_reports_corp(bgn_de, corp_codes, dart_api_key, end_de=end_de, limiter=limiter))
+    else:
+        with ThreadPoolExecutor(max_workers=DART_MAX_WORKERS) as executor:
+            futures = [executor.submit(get_reports_date, day, dart_api_key, limiter) for day in days]
+            for future in as_completed(futures): collect(future.result()[0])
+    return {name: sorted(results[name], key=lambda report: report.rcept_no) for name in index.d8_codes if name in results}
+
+def split_message(text: str, limit: int = TELEGRAM_MAX_LENGTH):
+    # Splits text on line boundaries into chunks of at most limit characters (Telegram message limit).
+    chunks = []
+    current = ""
+    for line in text.split("\n"):
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit and current:
+            chunks.append(current)
+            current = line
+        else: current = candidate
+    if current.strip(): chunks.append(current)
+    return chunks
+
+def filter_reports_date(date, index: WatchlistIndex, dart_api_key, stats: dict = None, strategy: str = None, rate: float = DART_RATE_PER_SEC):
+    # Returns {corp_name: [report, ...]} for watchlist corps with filings on date.
+    # stats holds the "total_page" estimate and its "total_page_date", updated in place (see estimate_total_page).
+    # strategy ("corp" | "sweep") skips planning, e.g. when a coordinator already chose for all shards.
+    stats = stats if stats is not None else {}
+    corp_codes = list(index.d8_codes.values())
+    limiter = RateLimiter(rate)
+    if strategy is None:
+        strategy, costs = plan_reports_query(len(corp_codes), estimate_total_page(date, stats, dart_api_key, limiter=limiter))
+        logger.info(f"DART query plan: {strategy} (costs {costs})")
+
+    if strategy == "corp":
+        full_reports = get_reports_corp(date, corp_codes, dart_api_key=dart_api_key, limiter=limiter)
+    else:
+        full_reports, total_page = get_reports_date(date, dart_api_key=dart_api_key, limiter=limiter)
+        stats["total_page"], stats["total_page_date"] = total_page, date
 
     results = {}
     for report in full_reports:
-        for corp_name, d8_code in watchlist.items():
-            if report["d8_code"] == d8_code:
-                results[corp_name] = report
-                break
+        corp_name = index.d8_to_name.get(report.corp_code)
+        if corp_name: results.setdefault(corp_name, []).append(report)
     return results
 
 '''
 뉴스 데이터 가져오기
 '''
-def get_news(stock_code: str, timeout: int = 20):
-    # Scrapes Naver Finance news for a single company by stock code.
-    # Returns a list of dicts with "title", "url", "date" keys.
+NAVER_BASE_URL = "https://finance.naver.com"
+NEWS_FRAME_RE = re.compile(rb'<iframe[^>]*\bid="news_frame"[^>]*>', re.IGNORECASE)
+NEWS_FRAME_SRC_RE = re.compile(rb'\bsrc="([^"]+)"', re.IGNORECASE)
+NEWS_FETCH_WORKERS = 8
+# Max raw pages waiting for, or inside, the parser pool.
+NEWS_QUEUE_SIZE = 16
+# Below this many pages, worker process start-up costs more than parsing in-process.
+NEWS_PROCESS_POOL_MIN = 100
+# Parser processes each import bs4 in their own interpreter. NEWS_PARSE_WORKERS overrides the default,
+# which follows the CPUs this process may run on (os.cpu_count() reports the host's on Cloud Run), capped.
+NEWS_PARSE_WORKERS = int(os.getenv("NEWS_PARSE_WORKERS", "0"))
+NEWS_PARSE_WORKERS_MAX = 4
+
+def default_parse_workers():
+    if NEWS_PARSE_WORKERS > 0: return NEWS_PARSE_WORKERS
+    try: cpus = len(os.sched_getaffinity(0))
+    except AttributeError: cpus = os.cpu_count() or 1   # No sched_getaffinity on macOS/Windows
+    return max(1, min(cpus, NEWS_PARSE_WORKERS_MAX))
+
+def fetch_news_html(stock_code: str, timeout: int = 20):
+    # I/O stage: downloads the Naver Finance news page of a company (following its news_frame iframe) as raw bytes.
+    # Returns b"" on failure.
     session = requests.Session()
     user_agent = os.getenv("USER_AGENT", "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127 Safari/537.36")
     accept_language = "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7"
     
-    base_url = "https://finance.naver.com/item"
+    base_url = NAVER_BASE_URL + "/item"
     
     headers = {
         "User-Agent": user_agent,
@@ -148,21 +364,27 @@ def get_news(stock_code: str, timeout: int = 20):
     try:
         resp = session.get(url, headers=headers, timeout=timeout)
         resp.raise_for_status()
-        resp.encoding = resp.apparent_encoding or 'euc-kr'
-        soup = BeautifulSoup(resp.text, "html.parser")
-    except Exception: return []
-
-    iframe = soup.select_one("iframe#news_frame")
-    if iframe:
-        iframe_src = iframe.get("src", "")
-        if iframe_src:
-            iframe_src = "https://finance.naver.com" + iframe_src
-            try:
-                resp = session.get(iframe_src, headers=headers, timeout=timeout)
-                resp.raise_for_status()
-                resp.encoding = resp.apparent_encoding or 'euc-kr'
-                soup = BeautifulSoup(resp.text, "html.parser")
-            except Exception: pass
+        content = resp.content
+    except Exception: return b""
+
+    # Locate the iframe with a regex so this stage never builds a parse tree.
+    iframe = NEWS_FRAME_RE.search(content)
+    iframe_src = NEWS_FRAME_SRC_RE.search(iframe.group(0)) if iframe else None
+    if iframe_src:
+        iframe_url = NAVER_BASE_URL + html.unescape(iframe_src.group(1).decode("ascii", "ignore"))
+        try:
+            resp = session.get(iframe_url, headers=headers, timeout=timeout)
+            resp.raise_for_status()
+            content = resp.content
+        except Exception: pass
+    return content
+
+def parse_news_html(content: bytes, stock_code: str = ""):
+    # CPU stage: extracts news rows from table.type5. Runs in a worker process, so it takes and returns plain data.
+    # Returns a list of NewsItem with the row date parsed once here.
+    if not content: return []
+    encoding = detect(content)["encoding"] or 'euc-kr'
+    soup = BeautifulSoup(content.decode(encoding, errors="replace"), "html.parser")
 
     table = soup.select_one("body > div > table.type5")
     if not table: table = soup.select_one("table.type5")
@@ -188,12 +410,7 @@ def get_news(stock_code: str, timeout: int = 20):
         return "https://finance.naver.com/" + href.lstrip("/")
 
     def normalize_date(raw: str):
-        if not raw: return ""
-        cleaned = re.sub(r"\s+", " ", raw).strip()
-        try:
-            parsed = datetime.strptime(cleaned, "%Y.%m.%d %H:%M")
-            return parsed.strftime("%Y.%m.%d %H:%M")
-        except ValueError: return cleaned
+        return re.sub(r"\s+", " ", raw).strip()
 
     for row in tbody.find_all("tr"):
         link_tags = row.select("a.tit")
@@ -209,56 +426,114 @@ def get_news(stock_code: str, timeout: int = 20):
             normalized_href = normalize_url(link.get("href", ""))
             if not normalized_href or normalized_href in seen_urls: continue
 
-            items.append({"title": title_text, "url": normalized_href, "date": date_text})
+            items.append(NewsItem.from_raw(stock_code, title_text, normalized_href, date_text))
             seen_urls.add(normalized_href)
     return items
 
+
+def get_news(stock_code: str, timeout: int = 20):
+    # Scrapes Naver Finance news for a single company by stock code.
+    # Returns a list of NewsItem.
+    return parse_news_html(fetch_news_html(stock_code, timeout=timeout), stock_code)
+
+def stream_news(stock_codes: list, fetch_workers: int = NEWS_FETCH_WORKERS, parse_workers: int = None, queue_size: int = NEWS_QUEUE_SIZE):
+    # Staged pipeline: fetch threads -> bounded queue -> parser processes.
+    # Yields (stock_code, news list) in completion order. Memory is bounded by queue_size pages.
+    stock_codes = list(stock_codes)
+    parse_workers = parse_workers or default_parse_workers()
+    if len(stock_codes) < NEWS_PROCESS_POOL_MIN: parse_workers = 1
+    raw_queue = queue.Queue(maxsize=queue_size)
+    done = object()
+    stop = threading.Event()   # Set when the consumer stops iterating, so blocked producers exit
+
+    def put(item):
+        while not stop.is_set():
+            try: return raw_queue.put(item, timeout=0.5)
+            except queue.Full: continue
+
+    def fetch_into_queue(stock_code):
+        if stop.is_set(): return
+        put((stock_code, fetch_news_html(stock_code)))   # Blocks while parsers are behind
+
+    def produce():
+        try:
+            with ThreadPoolExecutor(max_workers=fetch_workers) as executor:
+                list(executor.map(fetch_into_queue, stock_codes))
+        finally: put(done)
+
+    threading.Thread(target=produce, daemon=True).start()
+
+    try:
+        if parse_workers <= 1:
+            # Single core or small batch: a process pool would only add start-up and pickling overhead.
+            while (item := raw_queue.get()) is not done:
+                yield item[0], parse_news_html(item[1], item[0])
+            return
+
+        with ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            pending = {}
+            finished = False
+            try:
+                while not finished or pending:
+                    while not finished and len(pending) < queue_size:
+                        try: item = raw_queue.get(block=not pending)
+                        except queue.Empty: break
+                        if item is done:
+                            finished = True
+                            break
+                        pending[pool.submit(parse_news_html, item[1], item[0])] = item[0]
+                    if not pending: continue
+                    completed, _ = wait(pending, timeout=None if finished else 0.05, return_when=FIRST_COMPLETED)
+                    for future in completed:
+                        yield pending.pop(future), future.result()
+            finally:
+                for future in pending: future.cancel()
+                pool.shutdown(wait=True, cancel_futures=True)
+    finally: stop.set()
+
 '''
 저장된 데이터 구조에 맞게 변환
 '''
-def unpack_watchlist(watchlist):
-    d6_codes = {}
-    d8_codes = {}
-    for name, code_list in watchlist.items():
-        if code_list[0]: d6_codes[name] = code_list[0]
-        if code_list[1]: d8_codes[name] = code_list[1]
-    return d6_codes, d8_codes
-
 def unpack_last_message(loaded_data):
     printed_news = loaded_data.get("printed_news", {})
     printed_reports = loaded_data.get("printed_reports", {})
     return printed_news, printed_reports
 
 
-def send_news(myCloud, watchlist, bot_token, chat_id, last_hour):
-    d6_codes, _ = unpack_watchlist(watchlist)
-    stock_codes = list(d6_codes.values())
-    stock_code_to_name = {code: name for name, code in d6_codes.items()}
-    with ThreadPoolExecutor() as executor:
-        news_results = list(executor.map(get_news, stock_codes))
+def collect_news(index: WatchlistIndex, last_hour, archive=None):
+    # Fetches news of every watchlist stock and keeps deduplicated items of the last last_hour hours.
+    # Returns {corp_name: [NewsItem]} in watchlist order.
+    stock_codes = list(index.d6_codes.values())
+    stock_code_to_name = index.d6_to_name
 
-    now = get_korean_time()
-    # Convert to naive for comparison (scraped dates are already in Korean time)
-    cutoff = now.replace(tzinfo=None) - timedelta(hours=last_hour)
+    cutoff = get_korean_time().timestamp() - last_hour * 3600
+    fetched = {}
     news_by_corp = {}
-    for idx, news_list in enumerate(news_results):
-        corp_name = stock_code_to_name[stock_codes[idx]]
+    # Date filtering and dedup run here as parsed pages stream in from stream_news.
+    for stock_code, news_list in stream_news(stock_codes):
         if not news_list:
             continue
+        fetched[stock_code] = news_list
         deduplicated = []
         for news in news_list:
-            news_dt = datetime.strptime(news['date'], "%Y.%m.%d %H:%M")
-            if news_dt < cutoff:
+            if news.ts is None or news.ts < cutoff:
                 continue
-            titles = [item['title'] for item in deduplicated]
-            score, _ = get_duplicated_topic_score(news['title'], titles)
+            titles = [item.title for item in deduplicated]
+            score, _ = get_duplicated_topic_score(news.title, titles)
             if score < 0.3:
                 deduplicated.append(news)
         if deduplicated:
-            news_by_corp[corp_name] = deduplicated
+            news_by_corp[stock_code_to_name[stock_code]] = deduplicated
+    if archive is not None:
+        archive.add_news(fetched, names=stock_code_to_name)
+    # Restore watchlist order, since pages complete out of order.
+    return {name: news_by_corp[name] for name in index.d6_codes if name in news_by_corp}
+
 
+def send_news_digest(news_by_corp: dict, bot_token, chat_id):
     if not news_by_corp: return None
 
+    now = get_korean_time()
     planner = Planner(utc_time=9)
     hour_str = planner.time_str(now)
     header = now.strftime("%Y.%m.%d")
@@ -266,8 +541,8 @@ def send_news(myCloud, watchlist, bot_token, chat_id, last_hour):
     for corp_name, news_list in news_by_corp.items():
         lines.append(f"[{corp_name}]")
         for news in news_list:
-            title = news['title'].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
-            url_href = (news.get('url') or '').replace('&', '&amp;').replace('"', '&quot;')
+            title = news.title.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+            url_href = (news.url or '').replace('&', '&amp;').replace('"', '&quot;')
             if url_href:
                 lines.append(f"- <a href=\"{url_href}\">{title}</a>")
             else:
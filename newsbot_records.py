@@ -0,0 +1,97 @@
+import sys
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+# Korean timezone (UTC+9)
+KST = timezone(timedelta(hours=9))
+NEWS_DATE_FORMAT = "%Y.%m.%d %H:%M"
+REPORT_DATE_FORMAT = "%Y%m%d"
+
+def parse_kst(text: str, fmt: str):
+    # Korean-time date string -> epoch seconds, None if it does not parse.
+    try: return int(datetime.strptime(text, fmt).replace(tzinfo=KST).timestamp())
+    except (TypeError, ValueError): return None
+
+def format_kst(ts: int, fmt: str):
+    if ts is None: return ""
+    return datetime.fromtimestamp(ts, KST).strftime(fmt)
+
+def to_state_map(records_by_corp: dict):
+    # {corp_name: [record]} -> JSON-serializable {corp_name: [dict]}
+    return {corp_name: [record.to_state() for record in records] for corp_name, records in records_by_corp.items()}
+
+def from_state_map(data: dict, record_cls):
+    return {corp_name: [record_cls.from_state(item) for item in items] for corp_name, items in data.items()}
+
+def url_hash(url: str):
+    # 64-bit hash of a url for compact dedup sets.
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class NewsItem:
+    '''
+    Naver Finance news row. ts is epoch seconds (None if the page date did not parse).
+    '''
+    __slots__ = ("ticker", "title", "url", "ts", "url_hash")
+
+    def __init__(self, ticker: str, title: str, url: str, ts: int = None):
+        self.ticker = sys.intern(ticker or "")
+        self.title = title
+        self.url = url
+        self.ts = ts
+        self.url_hash = url_hash(url)
+
+    @classmethod
+    def from_raw(cls, ticker: str, title: str, url: str, date_text: str):
+        return cls(ticker, title, url, parse_kst(date_text, NEWS_DATE_FORMAT))
+
+    @property
+    def date(self): return format_kst(self.ts, NEWS_DATE_FORMAT)
+
+    def to_state(self):
+        return {"title": self.title, "url": self.url, "date": self.date, "ts": self.ts, "ticker": self.ticker}
+
+    @classmethod
+    def from_state(cls, data: dict, ticker: str = ""):
+        # Uses the stored ts when present so the date string is only parsed for old state files.
+        ts = data.get("ts")
+        if ts is None: ts = parse_kst(data.get("date"), NEWS_DATE_FORMAT)
+        return cls(data.get("ticker") or ticker, data.get("title", ""), data.get("url", ""), ts)
+
+    def __repr__(self): return f"NewsItem({self.ticker!r}, {self.title!r}, {self.date!r})"
+
+
+class Report:
+    '''
+    DART disclosure from list.json. ts is epoch seconds of the filing date (rcept_dt).
+    '''
+    __slots__ = ("corp_code", "ticker", "title", "rcept_no", "ts", "url_hash")
+
+    def __init__(self, corp_code: str, ticker: str, title: str, rcept_no: str, ts: int = None):
+        self.corp_code = sys.intern(corp_code or "")
+        self.ticker = sys.intern(ticker or "")
+        self.title = title
+        self.rcept_no = rcept_no
+        self.ts = ts
+        self.url_hash = url_hash(rcept_no)
+
+    @classmethod
+    def from_dart(cls, row: dict):
+        return cls(row["corp_code"], row.get("stock_code", ""), row["report_nm"], row["rcept_no"],
+                   parse_kst(row.get("rcept_dt"), REPORT_DATE_FORMAT))
+
+    @property
+    def date(self): return format_kst(self.ts, REPORT_DATE_FORMAT)
+
+    def to_state(self):
+        # "url" holds rcept_no to match the printed_reports layout of last_message.json.
+        return {"d8_code": self.corp_code, "stock_code": self.ticker, "title": self.title,
+                "url": self.rcept_no, "date": self.date, "ts": self.ts}
+
+    @classmethod
+    def from_state(cls, data: dict):
+        ts = data.get("ts")
+        if ts is None: ts = parse_kst(data.get("date"), REPORT_DATE_FORMAT)
+        return cls(data.get("d8_code", ""), data.get("stock_code", ""), data.get("title", ""), data.get("url", ""), ts)
+
+    def __repr__(self): return f"Report({self.corp_code!r}, {self.title!r}, {self.rcept_no!r})"
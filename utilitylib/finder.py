@@ -91,3 +91,28 @@ class CloudFinder:
         except Exception as e:
             print(f"Failed to load data: {e}")
             return False
+
+    # Check whether stored file exists
+    def exists(self, blob_name: str, local: bool = False):
+        # Returns True/False, None if it could not be checked (e.g. GCS error).
+        try:
+            if local: return os.path.exists(blob_name)
+            client = storage.Client()
+            bucket = client.bucket(self.bucket_name)
+            return bucket.blob(blob_name).exists()
+        except Exception as e:
+            print(f"Failed to check file: {e}")
+            return None
+
+    # Get version of stored file
+    def generation(self, blob_name: str, local: bool = False):
+        # Returns GCS blob generation (file modification time in local mode), None if missing.
+        try:
+            if local: return os.stat(blob_name).st_mtime_ns
+            client = storage.Client()
+            bucket = client.bucket(self.bucket_name)
+            blob = bucket.get_blob(blob_name)
+            return blob.generation if blob else None
+        except Exception as e:
+            print(f"Failed to get generation: {e}")
+            return None
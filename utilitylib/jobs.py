@@ -0,0 +1,116 @@
+import time
+import uuid
+import queue
+import threading
+
+
+'''
+JobQueue class to run functions on a background thread.
+Example:
+    def work(name, progress): progress("greeting"); return f"Hi {name}"
+
+    jobs = JobQueue()
+    job, created = jobs.submit("greet", work, kwargs={"name": "Alex"})
+    jobs.get(job["id"])
+    -> {"id": ..., "status": "done", "stage": "greeting", "result": "Hi Alex", ...}
+    jobs.wait(job["id"], timeout=60)
+    -> Same as get(), after blocking until the job is done or failed (or the timeout passes).
+    Submitting "greet" again while it is queued or running returns the same job with created=False.
+    With JobQueue(timeout=600), a job running longer than 600 seconds is marked failed and later jobs
+    run on a fresh worker thread, so one hung call cannot block its key forever.
+'''
+class JobQueue:
+    def __init__(self, history: int = 50, timeout: float = None):
+        '''
+        Initialize JobQueue. Only the latest history jobs are kept for get().
+        timeout (seconds) is the deadline of a running job; None waits forever.
+        '''
+        self.history = history
+        self.timeout = timeout
+        self.running = None
+        self.jobs = {}
+        self.active = {}
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.finished = threading.Condition(self.lock)
+        self.worker = None
+
+    def submit(self, key: str, func: callable, kwargs: dict = None):
+        '''
+        Queue func(progress=..., **kwargs) unless a job with the same key is queued or running.
+        Returns (job, created).
+        '''
+        with self.lock:
+            self._expire()
+            active_id = self.active.get(key)
+            if active_id: return dict(self.jobs[active_id]), False
+
+            job_id = uuid.uuid4().hex
+            self.jobs[job_id] = {"id": job_id, "key": key, "status": "queued", "stage": "",
+                                 "result": None, "created_at": time.time(), "started_at": None, "finished_at": None}
+            self.active[key] = job_id
+            self._trim()
+            self.queue.put((job_id, func, kwargs or {}))
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self._run, daemon=True)
+                self.worker.start()
+            return dict(self.jobs[job_id]), True
+
+    def get(self, job_id: str):
+        '''
+        Return a copy of the job, or None if it is unknown or expired.
+        '''
+        with self.lock:
+            self._expire()
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait(self, job_id: str, timeout: float = None):
+        '''
+        Block until the job is done or failed, then return a copy of it.
+        Returns the job still queued or running if timeout (seconds) passes first, None if it is unknown.
+        '''
+        with self.finished:
+            self.finished.wait_for(lambda: self.jobs.get(job_id, {}).get("status") not in ("queued", "running"), timeout)
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _update(self, job_id: str, **fields):
+        with self.lock:
+            if job_id in self.jobs: self.jobs[job_id].update(fields)
+
+    def _expire(self):
+        # Fail the running job once it is past timeout and hand the queue to a new worker thread.
+        # The hung thread cannot be killed; it exits after its call returns, without touching the job again.
+        job = self.jobs.get(self.running)
+        if self.timeout is None or job is None or time.time() - job["started_at"] <= self.timeout: return
+        print(f"Job {job['id']} timed out after {self.timeout} seconds")
+        job.update(status="failed", result=f"Timed out after {self.timeout} seconds", finished_at=time.time())
+        if self.active.get(job["key"]) == job["id"]: del self.active[job["key"]]
+        self.running = None
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+        self.finished.notify_all()
+
+    def _trim(self):
+        # Drop the oldest finished jobs beyond history.
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in ("done", "failed")]
+        for job_id in finished[:max(len(self.jobs) - self.history, 0)]: del self.jobs[job_id]
+
+    def _run(self):
+        while True:
+            job_id, func, kwargs = self.queue.get()
+            with self.lock:
+                self.running = job_id
+                self.jobs[job_id].update(status="running", started_at=time.time())
+            try:
+                status, result = "done", func(progress=lambda stage: self._update(job_id, stage=stage), **kwargs)
+            except Exception as e:
+                print(f"Job {job_id} failed: {e}")
+                status, result = "failed", str(e)
+            with self.lock:
+                if self.running != job_id: return   # Timed out meanwhile; this thread was replaced
+                self.running = None
+                self.jobs[job_id].update(status=status, result=result, finished_at=time.time())
+                if self.active.get(self.jobs[job_id]["key"]) == job_id: del self.active[self.jobs[job_id]["key"]]
+                self.finished.notify_all()
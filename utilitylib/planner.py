@@ -1,3 +1,5 @@
+import heapq
+import time as _time
 from datetime import datetime, timedelta, timezone
 
 
@@ -5,26 +7,43 @@ from datetime import datetime, timedelta, timezone
 Planner class to execute functions at specified time.
 Example:
     def greet(name, message): print(f"Hi {name}, {message}")
-    
+
     planner = Planner(utc_time=9)
     planner.add_plan(hour=9, minute=0, buffer=5, func=greet, kwargs={"name": "Alex", "message": "Good morning!"})
     planner.run_schedule()
     -> "Hi Alex, Good morning!" Will be printed if system time is within 09:00-09:05AM
+
+Job scheduler with catch-up:
+    planner = Planner(utc_time=9, state=saved_state)
+    planner.add_job("greet", hour=9, minute=0, func=greet, kwargs={"name": "Alex", "message": "Good morning!"})
+    planner.run_pending()
+    -> Runs greet once if 09:00 has passed since the last recorded run, even if the trigger was late.
+    planner.next_due()
+    -> datetime of the next job, so the caller can return early or sleep until then.
+    saved_state = planner.state()
 '''
 class Planner:
-    def __init__(self, utc_time: int = 0):
+    def __init__(self, utc_time: int = 0, state: dict = None):
         '''
         Initialize Planner class with UTC time. 9 for KST.
+        state is the dict returned by state() on a previous run ({job name: last run ISO time}).
         '''
         self.timezone = timezone(timedelta(hours=utc_time))
         self.plans = []
-    
+        self.jobs = {}
+        self.queue = []
+        self.seq = 0
+        self.last_runs = {}
+        for name, value in (state or {}).items():
+            try: self.last_runs[name] = datetime.fromisoformat(value)
+            except (TypeError, ValueError): pass
+
     def add_plan(self, hour: int, minute: int, buffer: int, func: callable, kwargs: dict = {}):
         '''
         Add plan to execute func if system time is within [hour:minute, hour:minute + buffer] interval.
         '''
         self.plans.append((hour, minute, buffer, func, kwargs))
-    
+
     def run_schedule(self):
         '''
         Run all works in self.plans.
@@ -39,6 +58,109 @@ class Planner:
                 return True
         return False
 
+    def add_job(self, name: str, minute: int, func: callable, hour: int = None, kwargs: dict = None, max_delay: int = None):
+        '''
+        Add job fired every day at hour:minute, or every hour at :minute if hour is None.
+        A missed fire time is caught up once on the next run_pending().
+        max_delay (minutes) drops catch-ups older than that; None always catches up.
+        '''
+        job = {"name": name, "hour": hour, "minute": minute, "func": func,
+               "kwargs": kwargs or {}, "max_delay": max_delay}
+        self.jobs[name] = job
+
+    def now(self):
+        return datetime.now(self.timezone)
+
+    def _previous_fire(self, job: dict, current: datetime):
+        # Latest scheduled fire time <= current.
+        fire = current.replace(minute=job["minute"], second=0, microsecond=0)
+        if job["hour"] is None:
+            if fire > current: fire -= timedelta(hours=1)
+        else:
+            fire = fire.replace(hour=job["hour"])
+            if fire > current: fire -= timedelta(days=1)
+        return fire
+
+    def _next_fire(self, job: dict, current: datetime):
+        # Earliest scheduled fire time > current.
+        step = timedelta(hours=1) if job["hour"] is None else timedelta(days=1)
+        return self._previous_fire(job, current) + step
+
+    def _due_time(self, job: dict, current: datetime):
+        # Previous fire time if it has not been run yet (and is within max_delay), otherwise the next one.
+        previous = self._previous_fire(job, current)
+        last_run = self.last_runs.get(job["name"])
+        missed = last_run is None or last_run < previous
+        if missed and job["max_delay"] is not None:
+            missed = current - previous <= timedelta(minutes=job["max_delay"])
+        return previous if missed else self._next_fire(job, current)
+
+    def _push(self, job: dict, fire_time: datetime):
+        self.seq += 1
+        heapq.heappush(self.queue, (fire_time, self.seq, job["name"]))
+
+    def _rebuild(self, current: datetime):
+        # Re-key the queue against current time and the recorded last runs.
+        self.queue = []
+        for job in self.jobs.values(): self._push(job, self._due_time(job, current))
+
+    def pending(self, current: datetime = None):
+        '''
+        Return names of jobs that are due at current time, in fire time order.
+        '''
+        current = current or self.now()
+        self._rebuild(current)
+        return [name for fire_time, _, name in sorted(self.queue) if fire_time <= current]
+
+    def next_due(self, current: datetime = None):
+        '''
+        Return the fire time of the earliest job. Times <= current mean the job is already due.
+        '''
+        current = current or self.now()
+        self._rebuild(current)
+        return self.queue[0][0] if self.queue else None
+
+    def run_pending(self, current: datetime = None, on_job: callable = None):
+        '''
+        Run every due job once and record its run time. Returns {job name: result}.
+        A job that raises is not marked as run, so it is retried on the next call.
+        on_job(name) is called before each job starts.
+        '''
+        current = current or self.now()
+        self._rebuild(current)
+        results = {}
+        while self.queue and self.queue[0][0] <= current:
+            _, _, name = heapq.heappop(self.queue)
+            job = self.jobs[name]
+            if on_job: on_job(name)
+            try:
+                results[name] = job["func"](**job["kwargs"])
+                self.last_runs[name] = current
+            except Exception as e:
+                print(f"Failed to run job {name}: {e}")
+                results[name] = e
+            self._push(job, self._next_fire(job, current))
+        return results
+
+    def run_forever(self, on_run: callable = None):
+        '''
+        Run due jobs, then sleep exactly until the next fire time. on_run(results, state) is called after each round.
+        '''
+        while True:
+            results = self.run_pending()
+            if results and on_run: on_run(results, self.state())
+            next_time = self.next_due()
+            if next_time is None: return
+            # Failed jobs stay due; wait a minute before retrying them.
+            delay = (next_time - self.now()).total_seconds()
+            _time.sleep(delay + 1 if delay > 0 else 60)
+
+    def state(self):
+        '''
+        Return last run markers as a JSON-serializable dict.
+        '''
+        return {name: value.isoformat() for name, value in self.last_runs.items()}
+
     def time_str(self, time: datetime, disp_minutes: bool = False):
         '''
         Return time string in format of Korean string.